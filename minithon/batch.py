@@ -0,0 +1,209 @@
+from typing import Any, Iterable
+
+import numpy as np
+from numpy.typing import NDArray
+
+from minithon.interpreter import OPERATIONS, Code, Opcode, Operator, bind_inputs
+
+Lanes = slice | NDArray[np.intp]
+ARITHMETIC_OPERATORS = (
+    Operator.ADD,
+    Operator.SUBTRACT,
+    Operator.MULTIPLY,
+    Operator.DIVIDE,
+    Operator.MODULUS,
+)
+
+
+def as_number(values: Any) -> Any:
+    # Python treats booleans as 0 and 1 in arithmetic, but NumPy adds them as a logical
+    # or and refuses to subtract them
+    if np.asarray(values).dtype == np.bool_:
+        return np.asarray(values, dtype=np.int64)
+    return values
+
+
+class BatchExecutor:
+    # Each lane has its own program counter and every step runs the instruction with the
+    # lowest one for just the lanes sitting on it, so branches and loops act as masks.
+    # Finished lanes are retired once they're half the batch.
+
+    def __init__(self, code: Code, lane_count: int, outputs: list[str]) -> None:
+        self.instructions = code.instructions
+        self.constants = list(code.constants)
+        self.variables = code.variables
+        self.outputs = outputs
+        self.lane_count = lane_count
+        self.registers: list[NDArray[Any] | None] = [None] * code.register_count
+        # Lanes each register has been written in, the rest hold a placeholder zero
+        self.assigned: list[NDArray[np.bool_] | None] = [None] * code.register_count
+        self.pcs = np.zeros(lane_count, dtype=np.intp)
+        # Original position of each lane still being run
+        self.lane_ids = np.arange(lane_count)
+        self.results: dict[str, NDArray[Any]] = {}
+        self.results_assigned: dict[str, NDArray[np.bool_]] = {}
+
+    def operand(self, operand: int, lanes: Lanes) -> Any:
+        if operand >= 0:
+            values = self.registers[operand]
+            if values is None:
+                return np.full(self.pcs.size, None, dtype=object)[lanes]
+            return values[lanes]
+        constant = self.constants[~operand]
+        if isinstance(constant, np.ndarray):
+            return constant[lanes]
+        return constant
+
+    def store(self, target: int, lanes: Lanes, values: Any) -> None:
+        values = np.asarray(values)
+        registers = self.registers[target]
+        if registers is None:
+            registers = np.zeros(self.pcs.size, dtype=values.dtype)
+        else:
+            dtype = np.result_type(registers.dtype, values.dtype)
+            if dtype != registers.dtype:
+                registers = registers.astype(dtype)
+        registers[lanes] = values
+        self.registers[target] = registers
+        assigned = self.assigned[target]
+        if assigned is None:
+            assigned = np.zeros(self.pcs.size, dtype=np.bool_)
+            self.assigned[target] = assigned
+        assigned[lanes] = True
+
+    def truthy(self, values: Any, lanes: Lanes) -> NDArray[np.bool_]:
+        values = np.asarray(values)
+        if values.dtype.kind in "US":
+            truth = np.char.str_len(values) > 0
+        elif values.dtype.kind == "O":
+            truth = np.vectorize(bool, otypes=[np.bool_])(values)
+        else:
+            truth = values.astype(np.bool_)
+        size = self.pcs.size if isinstance(lanes, slice) else lanes.size
+        return np.broadcast_to(truth, (size,))
+
+    def step(self, pc: int, lanes: Lanes) -> None:
+        opcode, target, left, right, operator_ = self.instructions[pc]
+        if opcode == Opcode.MOVE:
+            self.store(target, lanes, self.operand(left, lanes))
+            self.pcs[lanes] = pc + 1
+        elif opcode == Opcode.BINARY:
+            left_values = self.operand(left, lanes)
+            right_values = self.operand(right, lanes)
+            if operator_ in ARITHMETIC_OPERATORS:
+                left_values = as_number(left_values)
+                right_values = as_number(right_values)
+            if operator_ == Operator.AND:
+                truth = self.truthy(left_values, lanes)
+                values = np.where(truth, right_values, left_values)
+            elif operator_ == Operator.OR:
+                truth = self.truthy(left_values, lanes)
+                values = np.where(truth, left_values, right_values)
+            else:
+                values = OPERATIONS[operator_](left_values, right_values)
+            self.store(target, lanes, values)
+            self.pcs[lanes] = pc + 1
+        elif opcode == Opcode.GOTO:
+            self.pcs[lanes] = target
+        else:
+            jump = self.truthy(self.operand(left, lanes), lanes)
+            if opcode == Opcode.IF_NOT_GOTO:
+                jump = ~jump
+            self.pcs[lanes] = np.where(jump, target, pc + 1)
+
+    def retire(self, finished: NDArray[np.bool_]) -> None:
+        lane_ids = self.lane_ids[finished]
+        for identifier in self.outputs:
+            reg = self.variables[identifier]
+            values = self.registers[reg]
+            assigned = self.assigned[reg]
+            if values is None or assigned is None:
+                continue
+            values = values[finished]
+            result = self.results.get(identifier)
+            if result is None:
+                result = np.zeros(self.lane_count, dtype=values.dtype)
+            else:
+                dtype = np.result_type(result.dtype, values.dtype)
+                if dtype != result.dtype:
+                    result = result.astype(dtype)
+            result[lane_ids] = values
+            self.results[identifier] = result
+            result_assigned = self.results_assigned.setdefault(
+                identifier, np.zeros(self.lane_count, dtype=np.bool_)
+            )
+            result_assigned[lane_ids] = assigned[finished]
+        running = ~finished
+        self.lane_ids = self.lane_ids[running]
+        self.pcs = self.pcs[running]
+        self.registers = [
+            None if values is None else values[running] for values in self.registers
+        ]
+        self.assigned = [
+            None if assigned is None else assigned[running]
+            for assigned in self.assigned
+        ]
+        self.constants = [
+            constant[running] if isinstance(constant, np.ndarray) else constant
+            for constant in self.constants
+        ]
+
+    def run(self) -> dict[str, np.ma.MaskedArray[Any, Any]]:
+        end = len(self.instructions)
+        # Match the scalar interpreter, which raises on division by zero
+        with np.errstate(divide="raise", invalid="raise"):
+            while self.pcs.size:
+                pc = int(self.pcs.min())
+                if pc >= end:
+                    break
+                selected = self.pcs == pc
+                lanes: Lanes = (
+                    slice(None) if selected.all() else np.flatnonzero(selected)
+                )
+                self.step(pc, lanes)
+                # Only the last instruction or a jump past it can finish lanes
+                if pc + 1 == end or self.instructions[pc].target == end:
+                    finished = self.pcs >= end
+                    if np.count_nonzero(finished) * 2 > self.pcs.size:
+                        self.retire(finished)
+        self.retire(np.ones(self.pcs.size, dtype=np.bool_))
+        outputs: dict[str, np.ma.MaskedArray[Any, Any]] = {}
+        for identifier in self.outputs:
+            result = self.results.get(identifier)
+            if result is None:
+                result = np.full(self.lane_count, None, dtype=object)
+                mask = np.ones(self.lane_count, dtype=np.bool_)
+            else:
+                mask = ~self.results_assigned[identifier]
+            outputs[identifier] = np.ma.MaskedArray(result, mask=mask)
+        return outputs
+
+
+def execute_batch(
+    code: Code,
+    inputs: dict[str, NDArray[Any]],
+    outputs: Iterable[str] | None = None,
+) -> dict[str, np.ma.MaskedArray[Any, Any]]:
+    """
+    Executes the program once per lane of the input arrays, all lanes at once.
+
+    Inputs replace the first assignment of their variable, same as execute(). Returns
+    an array per output variable, every variable by default. Arithmetic follows NumPy
+    so integers are 64-bit and overflow wraps around silently instead of raising or
+    growing like in execute(). Outputs are masked in the lanes that never assign the
+    variable, where execute() would return None.
+    """
+    arrays = {
+        identifier: np.asarray(values) for identifier, values in inputs.items()
+    }
+    if any(array.ndim != 1 for array in arrays.values()) or (
+        len({array.size for array in arrays.values()}) > 1
+    ):
+        raise ValueError("Input arrays must be one-dimensional and of equal length")
+    lane_count = next(iter(arrays.values())).size if arrays else 1
+    output_identifiers = list(code.variables if outputs is None else outputs)
+    for identifier in output_identifiers:
+        if identifier not in code.variables:
+            raise ValueError(f'Unknown output variable "{identifier}"')
+    code = bind_inputs(code, arrays)
+    return BatchExecutor(code, lane_count, output_identifiers).run()
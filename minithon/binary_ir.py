@@ -0,0 +1,293 @@
+import mmap
+import struct
+from os import PathLike
+from typing import Any, Sequence, overload
+
+from minithon.interpreter import Code, Instruction, Opcode, Operator
+
+# Layout, all little-endian:
+#   header
+#   instructions       fixed-width records, jump targets are instruction indices
+#   constant offsets   u32 per constant, relative to the start of the constant data
+#   constant data      tag byte followed by the constant's payload
+#   variables          u32 name length, utf-8 name, u32 register
+MAGIC = b"MIIR"
+VERSION = 1
+HEADER_STRUCT = struct.Struct("<4sHxxIIIIII")
+INSTRUCTION_STRUCT = struct.Struct("<BiiiB")
+U32_STRUCT = struct.Struct("<I")
+INT_STRUCT = struct.Struct("<q")
+FLOAT_STRUCT = struct.Struct("<d")
+
+TAG_INT = 0
+TAG_BIG_INT = 1  # Stored as decimal text
+TAG_FLOAT = 2
+TAG_FALSE = 3
+TAG_TRUE = 4
+TAG_STRING = 5
+
+INT_MIN = -(2**63)
+INT_MAX = 2**63 - 1
+
+
+class InvalidCodeFile(Exception):
+    pass
+
+
+def encode_constant(constant: Any) -> bytes:
+    if isinstance(constant, bool):
+        return bytes([TAG_TRUE if constant else TAG_FALSE])
+    if isinstance(constant, int):
+        if INT_MIN <= constant <= INT_MAX:
+            return bytes([TAG_INT]) + INT_STRUCT.pack(constant)
+        text = str(constant).encode()
+        return bytes([TAG_BIG_INT]) + U32_STRUCT.pack(len(text)) + text
+    if isinstance(constant, float):
+        return bytes([TAG_FLOAT]) + FLOAT_STRUCT.pack(constant)
+    if isinstance(constant, str):
+        text = constant.encode()
+        return bytes([TAG_STRING]) + U32_STRUCT.pack(len(text)) + text
+    raise TypeError(f"Unsupported constant type {type(constant).__name__}")
+
+
+def decode_constant(buffer: Any, offset: int) -> Any:
+    tag = buffer[offset]
+    offset += 1
+    if tag == TAG_INT:
+        return INT_STRUCT.unpack_from(buffer, offset)[0]
+    if tag == TAG_FLOAT:
+        return FLOAT_STRUCT.unpack_from(buffer, offset)[0]
+    if tag in (TAG_FALSE, TAG_TRUE):
+        return tag == TAG_TRUE
+    if tag in (TAG_BIG_INT, TAG_STRING):
+        (length,) = U32_STRUCT.unpack_from(buffer, offset)
+        offset += U32_STRUCT.size
+        if offset + length > len(buffer):
+            raise InvalidCodeFile("Truncated constant")
+        text = bytes(buffer[offset : offset + length]).decode()
+        return int(text) if tag == TAG_BIG_INT else text
+    raise InvalidCodeFile(f"Invalid constant tag {tag}")
+
+
+def dumps(code: Code) -> bytes:
+    instructions = b"".join(
+        INSTRUCTION_STRUCT.pack(*instruction) for instruction in code.instructions
+    )
+    encoded_constants = [encode_constant(constant) for constant in code.constants]
+    constant_offsets = bytearray()
+    offset = 0
+    for encoded in encoded_constants:
+        constant_offsets += U32_STRUCT.pack(offset)
+        offset += len(encoded)
+    constant_data = b"".join(encoded_constants)
+    variables = bytearray()
+    for identifier, reg in code.variables.items():
+        name = identifier.encode()
+        variables += U32_STRUCT.pack(len(name)) + name + U32_STRUCT.pack(reg)
+    constants_data_offset = (
+        HEADER_STRUCT.size + len(instructions) + len(constant_offsets)
+    )
+    header = HEADER_STRUCT.pack(
+        MAGIC,
+        VERSION,
+        len(code.instructions),
+        code.register_count,
+        len(code.constants),
+        len(code.variables),
+        constants_data_offset,
+        constants_data_offset + len(constant_data),
+    )
+    return b"".join(
+        (header, instructions, constant_offsets, constant_data, variables)
+    )
+
+
+def write(code: Code, path: str | PathLike[str]) -> None:
+    with open(path, "wb") as f:
+        f.write(dumps(code))
+
+
+def is_code_file(path: str | PathLike[str]) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class MappedInstructions(Sequence[Instruction]):
+    """Decodes an instruction record the first time it's accessed."""
+
+    def __init__(self, buffer: Any, offset: int, length: int) -> None:
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+        self.decoded: list[Instruction | None] = [None] * length
+
+    def __len__(self) -> int:
+        return self.length
+
+    @overload
+    def __getitem__(self, index: int) -> Instruction:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Instruction]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Instruction | list[Instruction]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        try:
+            instruction = self.decoded[index]
+        except IndexError:
+            raise IndexError("instruction index out of range")
+        if instruction is None:
+            if index < 0:
+                index += self.length
+            # Opcode and operator are left as plain ints, they compare equal to the enums
+            instruction = Instruction._make(
+                INSTRUCTION_STRUCT.unpack_from(
+                    self.buffer, self.offset + index * INSTRUCTION_STRUCT.size
+                )
+            )
+            self.decoded[index] = instruction
+        return instruction
+
+
+class MappedConstants(Sequence[Any]):
+    """Decodes a constant the first time it's accessed."""
+
+    def __init__(
+        self, buffer: Any, offsets_offset: int, data_offset: int, length: int
+    ) -> None:
+        self.buffer = buffer
+        self.offsets_offset = offsets_offset
+        self.data_offset = data_offset
+        self.length = length
+        self.decoded: dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if (constant := self.decoded.get(index)) is not None:
+            return constant
+        if not 0 <= index < self.length:
+            raise IndexError("constant index out of range")
+        (offset,) = U32_STRUCT.unpack_from(
+            self.buffer, self.offsets_offset + index * U32_STRUCT.size
+        )
+        try:
+            constant = decode_constant(self.buffer, self.data_offset + offset)
+        except struct.error:
+            raise InvalidCodeFile("Truncated constant")
+        self.decoded[index] = constant
+        return constant
+
+
+class CodeFile:
+    """Memory-maps a file written by write() and exposes it as Code lazily."""
+
+    def __init__(self, path: str | PathLike[str]) -> None:
+        with open(path, "rb") as f:
+            try:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise InvalidCodeFile("Empty code file")
+        try:
+            self.code = self.load()
+        except Exception:
+            self.mmap.close()
+            raise
+
+    def load(self) -> Code:
+        if len(self.mmap) < HEADER_STRUCT.size:
+            raise InvalidCodeFile("File is too small to be a code file")
+        (
+            magic,
+            version,
+            instruction_count,
+            register_count,
+            constant_count,
+            variable_count,
+            constants_data_offset,
+            variables_offset,
+        ) = HEADER_STRUCT.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            raise InvalidCodeFile("Not a code file")
+        if version != VERSION:
+            raise InvalidCodeFile(f"Unsupported code file version {version}")
+        # Checked up front so a truncated file fails here rather than partway through a run
+        instructions_end = (
+            HEADER_STRUCT.size + instruction_count * INSTRUCTION_STRUCT.size
+        )
+        constant_offsets_end = instructions_end + constant_count * U32_STRUCT.size
+        if not (
+            constant_offsets_end
+            <= constants_data_offset
+            <= variables_offset
+            <= len(self.mmap)
+        ):
+            raise InvalidCodeFile("Code file is truncated")
+        for index in range(constant_count):
+            (offset,) = U32_STRUCT.unpack_from(
+                self.mmap, instructions_end + index * U32_STRUCT.size
+            )
+            if constants_data_offset + offset >= variables_offset:
+                raise InvalidCodeFile("Constant offset out of range")
+        instructions = MappedInstructions(
+            self.mmap, HEADER_STRUCT.size, instruction_count
+        )
+        constants = MappedConstants(
+            self.mmap,
+            HEADER_STRUCT.size + instruction_count * INSTRUCTION_STRUCT.size,
+            constants_data_offset,
+            constant_count,
+        )
+        variables: dict[str, int] = {}
+        offset = variables_offset
+        for _ in range(variable_count):
+            if offset + U32_STRUCT.size > len(self.mmap):
+                raise InvalidCodeFile("Code file is truncated")
+            (length,) = U32_STRUCT.unpack_from(self.mmap, offset)
+            offset += U32_STRUCT.size
+            if offset + length + U32_STRUCT.size > len(self.mmap):
+                raise InvalidCodeFile("Code file is truncated")
+            identifier = self.mmap[offset : offset + length].decode()
+            offset += length
+            (variables[identifier],) = U32_STRUCT.unpack_from(self.mmap, offset)
+            offset += U32_STRUCT.size
+        return Code(instructions, constants, register_count, variables)
+
+    def close(self) -> None:
+        self.mmap.close()
+
+    def __enter__(self) -> "CodeFile":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def disassemble(code: Code) -> str:
+    def operand(value: int) -> str:
+        return f"r{value}" if value >= 0 else repr(code.constants[~value])
+
+    lines: list[str] = []
+    for index, (opcode, target, left, right, operator_) in enumerate(
+        code.instructions
+    ):
+        opcode = Opcode(opcode)
+        if opcode == Opcode.MOVE:
+            args = f"r{target}, {operand(left)}"
+        elif opcode == Opcode.BINARY:
+            operator_name = Operator(operator_).name
+            args = f"r{target}, {operand(left)}, {operand(right)}, {operator_name}"
+        elif opcode == Opcode.GOTO:
+            args = f"{target}"
+        else:
+            args = f"{operand(left)}, {target}"
+        lines.append(f"{index:>6} {opcode.name:<12}{args}")
+    return "\n".join(lines)
@@ -1,19 +1,45 @@
+from bisect import bisect_right
+from functools import lru_cache
+import re
+from typing import Any
+
+
+@lru_cache(maxsize=8)
+def line_starts(source_code: str) -> list[int]:
+    # Offset of the first character of every line, built once per source and searched with bisect
+    starts = [0]
+    starts.extend(
+        match_object.end() for match_object in re.finditer("\n", source_code)
+    )
+    return starts
+
+
 class CommonException(Exception):
     def __init__(
         self, msg: str, source_code: str, position: int, print_token=True
     ) -> None:
-        line_start_pos = (
-            source_code.rfind("\n", 0, position) + 1 if position != 0 else 0
+        starts = line_starts(source_code)
+        line_index = bisect_right(starts, position) - 1
+        line_start_pos = starts[line_index]
+        line_end_pos = (
+            starts[line_index + 1] - 1
+            if line_index + 1 < len(starts)
+            else len(source_code)
         )
-        line_end_pos = source_code.find("\n", position)
         line = source_code[line_start_pos:line_end_pos]
         token_line_pos = position - line_start_pos
         token = line[token_line_pos:].split(" ", 1)[0]
         highlighter = (" " * token_line_pos) + ("^" * len(token))
         err = f"{line}\n\033[32m{highlighter}\033[0m"
         final_err = f":\n{err}" if token else ""
-        line_number = source_code[:position].count("\n") + 1
+        line_number = line_index + 1
         token_str = f'\033[32m"{token}"\033[0m ' if print_token else ""
         super().__init__(
             f"\033[31m{msg} \033[0m{token_str}\033[31mat line {line_number}\033[0m{final_err}"
         )
+        self.line_number = line_number
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Subclasses take different arguments, so rebuild from the formatted message
+        # without calling __init__ again
+        return self.__class__.__new__, (self.__class__, *self.args), self.__dict__
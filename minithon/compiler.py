@@ -0,0 +1,26 @@
+from typing import NamedTuple
+
+from minithon.common import CommonException
+from minithon.icg import ICG
+from minithon.lexer import tokenize
+from minithon.parser.main import Parser
+
+
+class Compilation(NamedTuple):
+    intermediate_code: str
+    variables: dict[str, str]
+    errors: list[CommonException]
+
+
+def compile_source(source_code: str) -> Compilation:
+    tokens, lexer_errors = tokenize(source_code)
+    program, parser_errors = Parser(tokens, source_code).parse()
+    errors: list[CommonException] = [*lexer_errors, *parser_errors]
+    if errors:
+        return Compilation("", {}, errors)
+    icg = ICG()
+    try:
+        intermediate_code = icg.generate(program, source_code)
+    except CommonException as e:
+        return Compilation("", {}, [e])
+    return Compilation(intermediate_code, icg.variables, [])
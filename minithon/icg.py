@@ -25,6 +25,8 @@ class ICG:
         self.reg_count = 0
         self.label_count = 0
         self.identifier_to_register: dict[str, str] = {}
+        # The one register each identifier is stored in, reused across blocks
+        self.variables: dict[str, str] = {}
         self.while_label = ""
         self.while_exit_label = ""
         self.source_code: str
@@ -59,7 +61,10 @@ class ICG:
             if reg in added_regs:
                 self.identifier_to_register.pop(identifier)
         if self.reuse_registers:
-            self.reg_count = orig_reg_count
+            # Registers of variables first assigned in the block are still used after it
+            self.reg_count = max(
+                [orig_reg_count, *(int(reg[1:]) for reg in self.variables.values())]
+            )
 
     def generic_stmt(
         self,
@@ -73,6 +78,7 @@ class ICG:
             self.update_intermediate_code(f"goto {self.while_exit_label}")
 
     def while_stmt(self, stmt: ControlFlowStmtBlock) -> None:
+        outer_labels = self.while_label, self.while_exit_label
         self.while_label = self.get_label()
         self.update_intermediate_code(f"{self.while_label}:")
         stmt.expression = cast(Expression, stmt.expression)
@@ -80,8 +86,9 @@ class ICG:
         self.while_exit_label = self.get_label()
         self.update_intermediate_code(f"if (!{reg}) goto {self.while_exit_label}")
         self.block(stmt.block)
-        self.update_intermediate_code(f"goto {self.while_label}:")
+        self.update_intermediate_code(f"goto {self.while_label}")
         self.update_intermediate_code(f"{self.while_exit_label}:")
+        self.while_label, self.while_exit_label = outer_labels
 
     def if_stmt(self, stmt: IfStatementBlock) -> None:
         def get_block(
@@ -109,8 +116,10 @@ class ICG:
         blocks.append(get_block(stmt.if_statement, exit_label))
         for elif_ in stmt.elif_statements:
             blocks.append(get_block(elif_, exit_label))
+        # The else block runs when none of the conditions jumped so it goes right after them
         if stmt.else_statement is not None:
-            blocks.append(get_block(stmt.else_statement, exit_label))
+            get_block(stmt.else_statement, exit_label)()
+        self.update_intermediate_code(f"goto {exit_label}")
         for b in blocks:
             b()
         self.update_intermediate_code(f"{exit_label}:")
@@ -121,9 +130,18 @@ class ICG:
 
     def assignment_stmt(self, stmt: AssignmentStatement) -> None:
         expr_reg = self.expression_register(stmt.expression)
-        if (id_reg := self.identifier_register(stmt.identifier)) is not None:
+        identifier = stmt.identifier.lexeme
+        id_reg = self.identifier_register(stmt.identifier)
+        # A variable first assigned in a block that has since ended, e.g. both branches
+        # of an if, keeps writing to the same register so it has one value at the end
+        if id_reg is None:
+            id_reg = self.variables.get(identifier)
+        if id_reg is not None:
             self.update_intermediate_code(f"{id_reg} = {expr_reg}")
-        self.identifier_to_register[stmt.identifier.lexeme] = expr_reg
+            self.identifier_to_register[identifier] = id_reg
+            return
+        self.identifier_to_register[identifier] = expr_reg
+        self.variables[identifier] = expr_reg
 
     def identifier_register(self, token: Token) -> str | None:
         if token.type == TokenType.IDENTIFIER:
@@ -0,0 +1,251 @@
+import ast
+import math
+import operator
+import re
+from enum import IntEnum
+from typing import Any, Callable, NamedTuple, Sequence
+
+
+class Opcode(IntEnum):
+    MOVE = 0  # target = left
+    BINARY = 1  # target = left <operator> right
+    GOTO = 2  # Jump to target
+    IF_GOTO = 3  # Jump to target if left
+    IF_NOT_GOTO = 4  # Jump to target if not left
+
+
+class Operator(IntEnum):
+    NONE = 0
+    ADD = 1
+    SUBTRACT = 2
+    MULTIPLY = 3
+    DIVIDE = 4
+    MODULUS = 5
+    EQUAL = 6
+    GREATER_THAN_OR_EQUAL = 7
+    LESS_THAN_OR_EQUAL = 8
+    NOT_EQUAL = 9
+    GREATER_THAN = 10
+    LESS_THAN = 11
+    AND = 12
+    OR = 13
+
+
+OPERATOR_SYMBOLS: dict[str, Operator] = {
+    "+": Operator.ADD,
+    "-": Operator.SUBTRACT,
+    "*": Operator.MULTIPLY,
+    "/": Operator.DIVIDE,
+    "%": Operator.MODULUS,
+    "==": Operator.EQUAL,
+    ">=": Operator.GREATER_THAN_OR_EQUAL,
+    "<=": Operator.LESS_THAN_OR_EQUAL,
+    "!=": Operator.NOT_EQUAL,
+    ">": Operator.GREATER_THAN,
+    "<": Operator.LESS_THAN,
+    "&": Operator.AND,
+    "|": Operator.OR,
+}
+
+def logical_and(left: Any, right: Any) -> Any:
+    # Both operands are already evaluated, so there's no short-circuiting
+    return right if left else left
+
+
+def logical_or(left: Any, right: Any) -> Any:
+    return left if left else right
+
+
+OPERATIONS: dict[Operator, Callable[[Any, Any], Any]] = {
+    Operator.ADD: operator.add,
+    Operator.SUBTRACT: operator.sub,
+    Operator.MULTIPLY: operator.mul,
+    Operator.DIVIDE: operator.truediv,
+    Operator.MODULUS: operator.mod,
+    Operator.EQUAL: operator.eq,
+    Operator.GREATER_THAN_OR_EQUAL: operator.ge,
+    Operator.LESS_THAN_OR_EQUAL: operator.le,
+    Operator.NOT_EQUAL: operator.ne,
+    Operator.GREATER_THAN: operator.gt,
+    Operator.LESS_THAN: operator.lt,
+    Operator.AND: logical_and,
+    Operator.OR: logical_or,
+}
+
+
+class Instruction(NamedTuple):
+    opcode: Opcode
+    # Register for MOVE/BINARY, instruction index for jumps
+    target: int
+    # Operands are register numbers, or ~index into the constant pool when negative
+    left: int = 0
+    right: int = 0
+    operator: Operator = Operator.NONE
+
+
+class Code(NamedTuple):
+    instructions: Sequence[Instruction]
+    constants: Sequence[Any]
+    register_count: int
+    variables: dict[str, int]
+
+
+class InvalidIntermediateCode(Exception):
+    def __init__(self, msg: str, line: str) -> None:
+        super().__init__(f'{msg}: "{line}"')
+        self.msg = msg
+        self.line = line
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle with the constructor's arguments so it survives the trip back from a worker
+        return self.__class__, (self.msg, self.line)
+
+
+class StepLimitExceeded(Exception):
+    pass
+
+
+LABEL_REGEX = re.compile(r"(L\d+):")
+GOTO_REGEX = re.compile(r"goto (L\d+)")
+IF_GOTO_REGEX = re.compile(r"if \((!?)r(\d+)\) goto (L\d+)")
+BINARY_REGEX = re.compile(r"r(\d+) = r(\d+) (\S+) r(\d+)")
+MOVE_REGEX = re.compile(r"r(\d+) = (.+)")
+REGISTER_REGEX = re.compile(r"r(\d+)")
+
+
+def assemble(intermediate_code: str, variables: dict[str, str]) -> Code:
+    """Turns the ICG's text output into instructions with labels resolved to indices."""
+    label_indices: dict[str, int] = {}
+    # Jump targets hold the label until every label's index is known
+    pending: list[tuple[Instruction, str | None]] = []
+    constants: list[Any] = []
+    constant_indices: dict[tuple[type, Any], int] = {}
+    register_count = 0
+
+    def register(number: str) -> int:
+        nonlocal register_count
+        reg = int(number)
+        register_count = max(register_count, reg + 1)
+        return reg
+
+    def operand(value: str, line: str) -> int:
+        if (match_object := REGISTER_REGEX.fullmatch(value)) is not None:
+            return register(match_object.group(1))
+        try:
+            constant = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            raise InvalidIntermediateCode("Invalid literal", line)
+        key = (type(constant), constant)
+        if key not in constant_indices:
+            constant_indices[key] = len(constants)
+            constants.append(constant)
+        return ~constant_indices[key]
+
+    for line in intermediate_code.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if (match_object := LABEL_REGEX.fullmatch(line)) is not None:
+            label_indices[match_object.group(1)] = len(pending)
+        elif (match_object := GOTO_REGEX.fullmatch(line)) is not None:
+            pending.append((Instruction(Opcode.GOTO, 0), match_object.group(1)))
+        elif (match_object := IF_GOTO_REGEX.fullmatch(line)) is not None:
+            negate, reg, label = match_object.groups()
+            opcode = Opcode.IF_NOT_GOTO if negate else Opcode.IF_GOTO
+            pending.append((Instruction(opcode, 0, register(reg)), label))
+        elif (match_object := BINARY_REGEX.fullmatch(line)) is not None:
+            target, left, symbol, right = match_object.groups()
+            if symbol not in OPERATOR_SYMBOLS:
+                raise InvalidIntermediateCode("Unsupported operator", line)
+            instruction = Instruction(
+                Opcode.BINARY,
+                register(target),
+                register(left),
+                register(right),
+                OPERATOR_SYMBOLS[symbol],
+            )
+            pending.append((instruction, None))
+        elif (match_object := MOVE_REGEX.fullmatch(line)) is not None:
+            target, value = match_object.groups()
+            instruction = Instruction(
+                Opcode.MOVE, register(target), operand(value, line)
+            )
+            pending.append((instruction, None))
+        else:
+            raise InvalidIntermediateCode("Unrecognized instruction", line)
+
+    instructions: list[Instruction] = []
+    for instruction, label in pending:
+        if label is not None:
+            if label not in label_indices:
+                raise InvalidIntermediateCode("Undefined label", label)
+            instruction = instruction._replace(target=label_indices[label])
+        instructions.append(instruction)
+    code_variables = {
+        identifier: register(reg[1:]) for identifier, reg in variables.items()
+    }
+    return Code(instructions, constants, register_count, code_variables)
+
+
+def bind_inputs(code: Code, inputs: dict[str, Any]) -> Code:
+    """Replaces the first assignment of each input variable with a load of its value."""
+    instructions = list(code.instructions)
+    constants = list(code.constants)
+    for identifier, value in inputs.items():
+        if identifier not in code.variables:
+            raise ValueError(f'Unknown input variable "{identifier}"')
+        reg = code.variables[identifier]
+        for index, instruction in enumerate(instructions):
+            if (
+                instruction.opcode in (Opcode.MOVE, Opcode.BINARY)
+                and instruction.target == reg
+            ):
+                instructions[index] = Instruction(Opcode.MOVE, reg, ~len(constants))
+                constants.append(value)
+                break
+    return Code(instructions, constants, code.register_count, code.variables)
+
+
+def execute(
+    code: Code, inputs: dict[str, Any] | None = None, max_steps: float = math.inf
+) -> dict[str, Any]:
+    if inputs:
+        code = bind_inputs(code, inputs)
+    instructions = code.instructions
+    constants = code.constants
+    registers: list[Any] = [None] * code.register_count
+    end = len(instructions)
+    pc = 0
+    # Steps are only counted and checked on jumps, which every loop goes through.
+    # Straight-line code from segment_start up to the jump needs no counter.
+    steps = 0
+    segment_start = 0
+    while pc < end:
+        opcode, target, left, right, operator_ = instructions[pc]
+        pc += 1
+        if opcode == Opcode.MOVE:
+            registers[target] = registers[left] if left >= 0 else constants[~left]
+        elif opcode == Opcode.BINARY:
+            registers[target] = OPERATIONS[operator_](
+                registers[left] if left >= 0 else constants[~left],
+                registers[right] if right >= 0 else constants[~right],
+            )
+        elif opcode == Opcode.GOTO:
+            steps += pc - segment_start
+            if steps > max_steps:
+                raise StepLimitExceeded(
+                    f"Program ran for more than {max_steps} steps"
+                )
+            pc = segment_start = target
+        else:
+            condition = registers[left] if left >= 0 else constants[~left]
+            if bool(condition) == (opcode == Opcode.IF_GOTO):
+                steps += pc - segment_start
+                if steps > max_steps:
+                    raise StepLimitExceeded(
+                        f"Program ran for more than {max_steps} steps"
+                    )
+                pc = segment_start = target
+    return {
+        identifier: registers[reg] for identifier, reg in code.variables.items()
+    }
@@ -87,6 +87,11 @@ def all_tokens_regex() -> str:
     return combined
 
 
+@cache
+def tokens_pattern() -> re.Pattern[str]:
+    return re.compile(all_tokens_regex())
+
+
 class Token(NamedTuple):
     lexeme: str
     type: TokenType
@@ -104,7 +109,7 @@ def tokenize(
     tokens: list[Token] = []
     pos = 0
     exceptions: list[UnrecognizedToken] = []
-    for match_object in re.finditer(all_tokens_regex(), code):
+    for match_object in tokens_pattern().finditer(code):
         if match_object.start() != pos:
             e = UnrecognizedToken(
                 code,
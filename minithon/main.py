@@ -1,5 +1,114 @@
-def main():
-    pass
+import sys
+from typing import TYPE_CHECKING, Any, NoReturn
+
+if TYPE_CHECKING:
+    from minithon.interpreter import Code
+
+
+def run(code: "Code", backend: str) -> dict[str, Any]:
+    if backend == "python":
+        from minithon import python_backend
+
+        return python_backend.execute(code)
+    from minithon.interpreter import execute
+
+    return execute(code)
+
+
+def exit_with_runtime_error(e: Exception) -> NoReturn:
+    # Reported like compile errors, without a traceback
+    print(f"{type(e).__name__}: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def print_variables(variables: dict[str, Any]) -> None:
+    for identifier, value in variables.items():
+        print(f"{identifier} = {value!r}")
+
+
+def main() -> None:
+    # Imported here so that importing the package doesn't pay for the CLI
+    import argparse
+
+    from minithon.binary_ir import CodeFile, is_code_file, write
+    from minithon.compiler import compile_source
+    from minithon.interpreter import assemble
+
+    arg_parser = argparse.ArgumentParser(
+        prog="minithon", description="Compiler for the Minithon language"
+    )
+    arg_parser.add_argument(
+        "file", nargs="?", help="Minithon source file or compiled code file"
+    )
+    arg_parser.add_argument(
+        "--run",
+        action="store_true",
+        help="Execute the program and print its variables instead of the intermediate code",
+    )
+    arg_parser.add_argument(
+        "--backend",
+        choices=("interpreter", "python"),
+        default="interpreter",
+        help="How --run executes the program, python compiles it to a Python function",
+    )
+    arg_parser.add_argument(
+        "-o", "--output", help="Write the compiled program to this binary code file"
+    )
+    arg_parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a compile server speaking line-delimited JSON-RPC",
+    )
+    arg_parser.add_argument(
+        "--socket", help="Serve on this Unix socket instead of stdin/stdout"
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes used by the server, defaults to the CPU count",
+    )
+    arg_parser.add_argument(
+        "--max-steps",
+        type=int,
+        help="Instructions a program run by the server may execute, defaults to 10 million",
+    )
+    args = arg_parser.parse_args()
+    if args.serve:
+        # asyncio and multiprocessing are only needed in server mode
+        from minithon.server import serve
+
+        serve(args.socket, args.workers, args.max_steps)
+        return
+    if args.file is None:
+        arg_parser.error("a source file is required unless --serve is passed")
+    if is_code_file(args.file):
+        if not args.run:
+            arg_parser.error("compiled code files can only be run, pass --run")
+        try:
+            with CodeFile(args.file) as code_file:
+                variables = run(code_file.code, args.backend)
+        except Exception as e:
+            exit_with_runtime_error(e)
+        print_variables(variables)
+        return
+    with open(args.file) as f:
+        source_code = f.read()
+    compilation = compile_source(source_code)
+    if compilation.errors:
+        for e in compilation.errors:
+            print(e, file=sys.stderr)
+        sys.exit(1)
+    try:
+        code = assemble(compilation.intermediate_code, compilation.variables)
+        if args.output is not None:
+            write(code, args.output)
+        variables = run(code, args.backend) if args.run else None
+    except Exception as e:
+        exit_with_runtime_error(e)
+    if variables is not None:
+        print_variables(variables)
+    elif args.output is None:
+        print(compilation.intermediate_code)
 
 
 if __name__ == "__main__":
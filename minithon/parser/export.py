@@ -0,0 +1,80 @@
+import json
+from typing import Iterator, TextIO
+from minithon.parser.types import NodeWrapper
+
+# All exporters walk the tree with an explicit stack and write one chunk per node,
+# so arbitrarily large/deep trees are streamed at constant recursion depth
+
+
+def walk(root: NodeWrapper) -> Iterator[tuple[int, int | None, NodeWrapper]]:
+    """Pre-order traversal yielding (node_id, parent_id, node_wrapper)."""
+    next_id = 0
+    stack: list[tuple[NodeWrapper, int | None]] = [(root, None)]
+    while stack:
+        node_wrapper, parent_id = stack.pop()
+        node_id = next_id
+        next_id += 1
+        yield node_id, parent_id, node_wrapper
+        stack.extend(
+            (child, node_id) for child in reversed(node_wrapper.node.children)
+        )
+
+
+def label(node_wrapper: NodeWrapper) -> str:
+    return json.dumps(str(node_wrapper.node.value))
+
+
+def jsonl_lines(root: NodeWrapper) -> Iterator[str]:
+    for node_id, parent_id, node_wrapper in walk(root):
+        record = {
+            "id": node_id,
+            "parent": parent_id,
+            "type": type(node_wrapper).__name__,
+            "value": str(node_wrapper.node.value),
+        }
+        yield f"{json.dumps(record)}\n"
+
+
+def dot_lines(root: NodeWrapper) -> Iterator[str]:
+    yield "digraph ParseTree {\n"
+    for node_id, parent_id, node_wrapper in walk(root):
+        yield f"  n{node_id} [label={label(node_wrapper)}];\n"
+        if parent_id is not None:
+            yield f"  n{parent_id} -> n{node_id};\n"
+    yield "}\n"
+
+
+def sexpr_chunks(root: NodeWrapper) -> Iterator[str]:
+    # None on the stack marks the closing paranthesis of a node with children
+    stack: list[NodeWrapper | None] = [root]
+    needs_space = False
+    while stack:
+        node_wrapper = stack.pop()
+        if node_wrapper is None:
+            yield ")"
+            needs_space = True
+            continue
+        if needs_space:
+            yield " "
+        children = node_wrapper.node.children
+        if not children:
+            yield label(node_wrapper)
+            needs_space = True
+            continue
+        yield f"({label(node_wrapper)}"
+        needs_space = True
+        stack.append(None)
+        stack.extend(reversed(children))
+    yield "\n"
+
+
+def export_jsonl(root: NodeWrapper, file: TextIO) -> None:
+    file.writelines(jsonl_lines(root))
+
+
+def export_dot(root: NodeWrapper, file: TextIO) -> None:
+    file.writelines(dot_lines(root))
+
+
+def export_sexpr(root: NodeWrapper, file: TextIO) -> None:
+    file.writelines(sexpr_chunks(root))
@@ -22,12 +22,55 @@ class Parser:
         self.current_node: Node
         self.source_code = source_code
         self.block_id = 0
+        self.errors: list[SyntaxError] = []
+        self.stop_on_error = False
+        # How many parentheses the expression being parsed is inside
+        self.paren_depth = 0
 
     def raise_syntax_error(self, msg: str) -> NoReturn:
         raise SyntaxError(msg, self.source_code, self.current_token.position)
 
-    def parse(self) -> Program:
-        return self.program()
+    def parse(self, stop_on_error=False) -> tuple[Program, list[SyntaxError]]:
+        self.stop_on_error = stop_on_error
+        self.errors = []
+        self.paren_depth = 0
+        program_ = self.program()
+        return program_, self.errors
+
+    def recover(self, error: SyntaxError) -> None:
+        if self.stop_on_error:
+            raise error
+        self.errors.append(error)
+        self.paren_depth = 0
+        # Panic mode, discard tokens until the end of the line then resume at the next statement
+        while (
+            self.current_token.type != TokenType.NEWLINE
+            and self.tokens[self.token_index + 1].type != TokenType.EOF
+        ):
+            self.token_index += 1
+            self.current_token = self.tokens[self.token_index]
+
+    def skip_unexpected_token(self) -> None:
+        self.token_index += 1
+        self.current_token = self.tokens[self.token_index]
+        while self.current_token.type in (
+            TokenType.COMMENT,
+            TokenType.NEWLINE,
+            TokenType.WHITESPACE,
+        ):
+            self.token_index += 1
+            self.current_token = self.tokens[self.token_index]
+        error = SyntaxError(
+            "Unexpected token", self.source_code, self.current_token.position
+        )
+        self.recover(error)
+
+    def at_eof(self) -> bool:
+        token_index = self.token_index
+        at_eof = self.match(TokenType.EOF)
+        self.token_index = token_index
+        self.current_token = self.tokens[token_index]
+        return at_eof
 
     def program(self) -> Program:
         block = self.block(-1)
@@ -53,14 +96,30 @@ class Parser:
         self.block_id += 1
         block_id_buffer = self.block_id
         statements: list[StatementType] = []
-        statement = self.statement(indent)
-        while statement is not None:
-            statements.append(statement)
+        errors_count = len(self.errors)
+        while True:
+            try:
+                statement = self.statement(indent)
+            except SyntaxError as e:
+                self.recover(e)
+            else:
+                if statement is None:
+                    # A nested block's missing first statement is reported by the caller
+                    if (
+                        prev_indent != -1
+                        and not statements
+                        and errors_count == len(self.errors)
+                    ):
+                        break
+                    if self.at_eof():
+                        break
+                    self.skip_unexpected_token()
+                else:
+                    statements.append(statement)
             new_indent = self.get_indent()
             if new_indent < indent:
                 break
-            statement = self.statement(indent)
-        if not statements:
+        if not statements and errors_count == len(self.errors):
             self.block_id -= 1
             return None
 
@@ -70,7 +129,7 @@ class Parser:
     def match(
         self, token_type: TokenType, ignore_newline=True, ignore_whitespace=True
     ) -> bool:
-        if self.token_index > len(self.tokens):
+        if self.token_index + 1 >= len(self.tokens):
             return False
         self.token_index += 1
         self.current_token = self.tokens[self.token_index]
@@ -80,7 +139,7 @@ class Parser:
             or (ignore_newline and self.current_token.type == TokenType.NEWLINE)
             or (ignore_whitespace and self.current_token.type == TokenType.WHITESPACE)
         ):
-            matched = self.match(token_type)
+            matched = self.match(token_type, ignore_newline, ignore_whitespace)
 
         else:
             matched = self.current_token.type == token_type
@@ -161,43 +220,49 @@ class Parser:
         stmt_block = self.control_flow_stmt_block(TokenType.WHILE, indent)
         return stmt_block
 
+    # Expressions only span lines inside parentheses, so elsewhere a missing operand is
+    # reported on its own line and error recovery resumes at that line's newline
     def factor(self) -> bool:
+        ignore_newline = self.paren_depth > 0
         return (
-            self.match(TokenType.BOOL_TRUE)
-            or self.match(TokenType.BOOL_FALSE)
-            or self.match(TokenType.IDENTIFIER)
-            or self.match(TokenType.STRING)
-            or self.match(TokenType.INTEGER)
-            or self.match(TokenType.FLOAT)
+            self.match(TokenType.BOOL_TRUE, ignore_newline)
+            or self.match(TokenType.BOOL_FALSE, ignore_newline)
+            or self.match(TokenType.IDENTIFIER, ignore_newline)
+            or self.match(TokenType.STRING, ignore_newline)
+            or self.match(TokenType.INTEGER, ignore_newline)
+            or self.match(TokenType.FLOAT, ignore_newline)
         )
 
     def expression(self) -> Expression | None:
         def match_ops() -> bool:
+            ignore_newline = self.paren_depth > 0
             return (
-                self.match(TokenType.OR)
-                or self.match(TokenType.AND)
-                or self.match(TokenType.NOT)
-                or self.match(TokenType.DIVIDE)
-                or self.match(TokenType.MULTIPLY)
-                or self.match(TokenType.ADD)
-                or self.match(TokenType.SUBTRACT)
-                or self.match(TokenType.EQUAL)
-                or self.match(TokenType.NOT_EQUAL)
-                or self.match(TokenType.MODULUS)
-                or self.match(TokenType.GREATER_THAN)
-                or self.match(TokenType.LESS_THAN)
-                or self.match(TokenType.GREATER_THAN_OR_EQUAL)
-                or self.match(TokenType.LESS_THAN_OR_EQUAL)
+                self.match(TokenType.OR, ignore_newline)
+                or self.match(TokenType.AND, ignore_newline)
+                or self.match(TokenType.NOT, ignore_newline)
+                or self.match(TokenType.DIVIDE, ignore_newline)
+                or self.match(TokenType.MULTIPLY, ignore_newline)
+                or self.match(TokenType.ADD, ignore_newline)
+                or self.match(TokenType.SUBTRACT, ignore_newline)
+                or self.match(TokenType.EQUAL, ignore_newline)
+                or self.match(TokenType.NOT_EQUAL, ignore_newline)
+                or self.match(TokenType.MODULUS, ignore_newline)
+                or self.match(TokenType.GREATER_THAN, ignore_newline)
+                or self.match(TokenType.LESS_THAN, ignore_newline)
+                or self.match(TokenType.GREATER_THAN_OR_EQUAL, ignore_newline)
+                or self.match(TokenType.LESS_THAN_OR_EQUAL, ignore_newline)
             )
 
         left_operand: Expression | Token
-        if self.match(TokenType.LPAREN):
+        if self.match(TokenType.LPAREN, self.paren_depth > 0):
+            self.paren_depth += 1
             expression = self.expression()
             if expression is None:
                 self.raise_syntax_error("Expected expression")
             left_operand = expression
             if not self.match(TokenType.RPAREN):
                 self.raise_syntax_error("Expected closing paranthesis")
+            self.paren_depth -= 1
         else:
             if not self.factor():
                 return None
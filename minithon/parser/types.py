@@ -1,8 +1,6 @@
 from typing import Any, Sequence
-import colorama
 from minithon.common import CommonException
 from minithon.lexer import Token
-from PrettyPrint import PrettyPrintTree
 
 
 class SyntaxError(CommonException):
@@ -19,15 +17,27 @@ class Node:
 
     # Purely for debugging purposes
     def dirty_tree_str(self) -> str:
-        string = str(self.value)
-        if self.children:
+        # Pre-order walk with an explicit stack of nodes and separators to emit, so deep
+        # trees don't hit the recursion limit and the string is only joined once
+        chunks: list[str] = []
+        stack: list[Node | str] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                chunks.append(item)
+                continue
+            string = str(item.value)
+            chunks.append(string)
+            if not item.children:
+                continue
             space_count = len(string) // 2
             space = " " * space_count
-            children_string = " | ".join(
-                child.node.dirty_tree_str() for child in self.children
-            )
-            string += f"\n{space}|{space}\n{space}V{space}\n{children_string}"
-        return string
+            chunks.append(f"\n{space}|{space}\n{space}V{space}\n")
+            for index in range(len(item.children) - 1, -1, -1):
+                stack.append(item.children[index].node)
+                if index:
+                    stack.append(" | ")
+        return "".join(chunks)
 
 
 class NodeWrapper:
@@ -161,14 +171,10 @@ class Program(NodeWrapper):
             print(self.node.dirty_tree_str())
             return
 
-        def get_children(node_wrapper: NodeWrapper):
-            return node_wrapper.node.children
-
-        def get_value(node_wrapper: NodeWrapper):
-            return str(node_wrapper.node.value)
+        # Imported lazily so that compiling doesn't pay for loading colorama and PrettyPrint
+        from minithon.parser.visualize import print_pretty_tree
 
-        pt = PrettyPrintTree(get_children, get_value, color=colorama.Back.BLUE)  # type: ignore
-        pt(self)  # type: ignore
+        print_pretty_tree(self)
 
 
 StatementType = (
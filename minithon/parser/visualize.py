@@ -0,0 +1,14 @@
+import colorama
+from PrettyPrint import PrettyPrintTree
+from minithon.parser.types import NodeWrapper
+
+
+def print_pretty_tree(root: NodeWrapper) -> None:
+    def get_children(node_wrapper: NodeWrapper):
+        return node_wrapper.node.children
+
+    def get_value(node_wrapper: NodeWrapper):
+        return str(node_wrapper.node.value)
+
+    pt = PrettyPrintTree(get_children, get_value, color=colorama.Back.BLUE)  # type: ignore
+    pt(root)  # type: ignore
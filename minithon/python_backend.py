@@ -0,0 +1,256 @@
+import hashlib
+import math
+from types import CodeType
+from typing import Any, Callable, Iterable
+
+from minithon.interpreter import Code, Instruction, Opcode, Operator
+
+OPERATOR_SYMBOLS: dict[Operator, str] = {
+    Operator.ADD: "+",
+    Operator.SUBTRACT: "-",
+    Operator.MULTIPLY: "*",
+    Operator.DIVIDE: "/",
+    Operator.MODULUS: "%",
+    Operator.EQUAL: "==",
+    Operator.GREATER_THAN_OR_EQUAL: ">=",
+    Operator.LESS_THAN_OR_EQUAL: "<=",
+    Operator.NOT_EQUAL: "!=",
+    Operator.GREATER_THAN: ">",
+    Operator.LESS_THAN: "<",
+}
+STRAIGHT_LINE_OPCODES = (Opcode.MOVE, Opcode.BINARY)
+FUNCTION_NAME = "program"
+CODE_OBJECT_CACHE_SIZE = 256
+
+# Compiled modules keyed by the SHA-256 of their Python source, oldest first
+code_object_cache: dict[str, CodeType] = {}
+
+
+class UnstructuredCode(Exception):
+    def __init__(self, msg: str, index: int) -> None:
+        super().__init__(f"{msg} at instruction {index}")
+        self.msg = msg
+        self.index = index
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return self.__class__, (self.msg, self.index)
+
+
+class PythonGenerator:
+    # Rebuilds the if/while statements the ICG lowered to labels and gotos, so every
+    # jump must match one of the shapes ICG.if_stmt(), ICG.while_stmt() and
+    # ICG.generic_stmt() emit
+    def __init__(self, code: Code, input_identifiers: Iterable[str]) -> None:
+        self.instructions = code.instructions
+        self.constants = code.constants
+        self.code = code
+        self.lines: list[str] = []
+        # Enclosing loops as (head, exit) instruction indices, innermost last
+        self.loops: list[tuple[int, int]] = []
+        # Loop head -> index of the goto that closes the loop
+        self.loop_ends: dict[int, int] = {}
+        for index, instruction in enumerate(self.instructions):
+            if instruction.opcode == Opcode.GOTO and instruction.target <= index:
+                self.loop_ends[instruction.target] = index
+        # Index of each input variable's first assignment -> the variable
+        self.input_definitions: dict[int, str] = {}
+        for identifier in input_identifiers:
+            if identifier not in code.variables:
+                raise ValueError(f'Unknown input variable "{identifier}"')
+            reg = code.variables[identifier]
+            for index, instruction in enumerate(self.instructions):
+                if (
+                    instruction.opcode in STRAIGHT_LINE_OPCODES
+                    and instruction.target == reg
+                ):
+                    self.input_definitions[index] = identifier
+                    break
+
+    def generate(self) -> str:
+        self.emit(f"def {FUNCTION_NAME}(inputs):", 0)
+        # Registers start out as None like in the interpreter
+        registers = sorted(
+            {
+                instruction.target
+                for instruction in self.instructions
+                if instruction.opcode in STRAIGHT_LINE_OPCODES
+            }
+        )
+        if registers:
+            self.emit(f"{' = '.join(f'r{reg}' for reg in registers)} = None", 1)
+        self.region(0, len(self.instructions), 1)
+        variables = ", ".join(
+            f"{identifier!r}: r{reg}"
+            for identifier, reg in self.code.variables.items()
+        )
+        self.emit(f"return {{{variables}}}", 1)
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, line: str, depth: int) -> None:
+        self.lines.append(f"{'    ' * depth}{line}")
+
+    def operand(self, operand: int) -> str:
+        if operand >= 0:
+            return f"r{operand}"
+        constant = self.constants[~operand]
+        if isinstance(constant, float) and not math.isfinite(constant):
+            return f"float({str(constant)!r})"
+        return repr(constant)
+
+    def straight_line(self, start: int, end: int, depth: int) -> None:
+        for index in range(start, end):
+            self.assignment(index, self.instructions[index], depth)
+
+    def assignment(self, index: int, instruction: Instruction, depth: int) -> None:
+        opcode, target, left, right, operator_ = instruction
+        if opcode not in STRAIGHT_LINE_OPCODES:
+            raise UnstructuredCode("Unexpected jump", index)
+        if (identifier := self.input_definitions.get(index)) is not None:
+            value = f"inputs[{identifier!r}]"
+        elif opcode == Opcode.MOVE:
+            value = self.operand(left)
+        elif operator_ == Operator.AND:
+            left_value = self.operand(left)
+            value = f"{self.operand(right)} if {left_value} else {left_value}"
+        elif operator_ == Operator.OR:
+            left_value = self.operand(left)
+            value = f"{left_value} if {left_value} else {self.operand(right)}"
+        else:
+            symbol = OPERATOR_SYMBOLS[Operator(operator_)]
+            value = f"{self.operand(left)} {symbol} {self.operand(right)}"
+        self.emit(f"r{target} = {value}", depth)
+
+    def straight_line_end(self, start: int, end: int) -> int:
+        index = start
+        while (
+            index < end and self.instructions[index].opcode in STRAIGHT_LINE_OPCODES
+        ):
+            index += 1
+        return index
+
+    def block(self, start: int, end: int, depth: int) -> None:
+        lines_count = len(self.lines)
+        self.region(start, end, depth)
+        if len(self.lines) == lines_count:
+            self.emit("pass", depth)
+
+    def region(self, start: int, end: int, depth: int) -> None:
+        index = start
+        while index < end:
+            loop_end = self.loop_ends.get(index)
+            if loop_end is not None and loop_end < end:
+                index = self.while_loop(index, loop_end, depth)
+                continue
+            instruction = self.instructions[index]
+            if instruction.opcode in STRAIGHT_LINE_OPCODES:
+                self.assignment(index, instruction, depth)
+                index += 1
+            elif instruction.opcode == Opcode.GOTO:
+                self.jump(index, instruction.target, depth)
+                index += 1
+            elif instruction.opcode == Opcode.IF_GOTO:
+                index = self.if_chain(index, end, depth)
+            else:
+                raise UnstructuredCode("Conditional jump outside a loop", index)
+
+    def jump(self, index: int, target: int, depth: int) -> None:
+        if not self.loops:
+            raise UnstructuredCode("Jump outside a loop", index)
+        head, exit_ = self.loops[-1]
+        if target == head:
+            self.emit("continue", depth)
+        elif target == exit_:
+            self.emit("break", depth)
+        else:
+            raise UnstructuredCode("Jump outside the innermost loop", index)
+
+    def while_loop(self, head: int, loop_end: int, depth: int) -> int:
+        # head: condition, if (!cond) goto exit, body, loop_end: goto head, exit:
+        condition_index = self.straight_line_end(head, loop_end)
+        condition = self.instructions[condition_index]
+        exit_ = loop_end + 1
+        if condition.opcode != Opcode.IF_NOT_GOTO or condition.target != exit_:
+            raise UnstructuredCode("Loop without a condition", head)
+        self.emit("while True:", depth)
+        self.straight_line(head, condition_index, depth + 1)
+        self.emit(f"if not {self.operand(condition.left)}:", depth + 1)
+        self.emit("break", depth + 2)
+        self.loops.append((head, exit_))
+        self.region(condition_index + 1, loop_end, depth + 1)
+        self.loops.pop()
+        return exit_
+
+    def if_chain(self, index: int, end: int, depth: int) -> int:
+        # cond, if (cond) goto A, cond, if (cond) goto B, ..., else body, goto exit,
+        # A: body, goto exit, B: body, goto exit, ..., exit:
+        first_target = self.instructions[index].target
+        exit_goto = self.instructions[first_target - 1]
+        exit_ = exit_goto.target
+        if exit_goto.opcode != Opcode.GOTO or not first_target <= exit_ <= end:
+            raise UnstructuredCode("If statement without an exit", index)
+        # (condition code start, conditional jump index, branch start)
+        conditions = [(index, index, first_target)]
+        else_start = index + 1
+        while True:
+            jump_index = self.straight_line_end(else_start, first_target - 1)
+            if jump_index == first_target - 1:
+                break
+            jump = self.instructions[jump_index]
+            if (
+                jump.opcode != Opcode.IF_GOTO
+                or not conditions[-1][2] < jump.target < exit_
+            ):
+                break
+            conditions.append((else_start, jump_index, jump.target))
+            else_start = jump_index + 1
+
+        branch_ends = [branch_start - 1 for _, _, branch_start in conditions[1:]]
+        last_end = exit_
+        if self.instructions[exit_ - 1].opcode == Opcode.GOTO and (
+            self.instructions[exit_ - 1].target == exit_
+        ):
+            last_end -= 1
+        branch_ends.append(last_end)
+        for position, (condition_start, jump_index, branch_start) in enumerate(
+            conditions
+        ):
+            if position:
+                # The first condition's code was already emitted by the enclosing region
+                self.straight_line(condition_start, jump_index, depth)
+            condition = self.instructions[jump_index]
+            self.emit(f"if {self.operand(condition.left)}:", depth)
+            self.block(branch_start, branch_ends[position], depth + 1)
+            if position + 1 == len(conditions) and else_start == first_target - 1:
+                return exit_
+            self.emit("else:", depth)
+            depth += 1
+        self.block(else_start, first_target - 1, depth)
+        return exit_
+
+
+def generate_python(code: Code, input_identifiers: Iterable[str] = ()) -> str:
+    return PythonGenerator(code, input_identifiers).generate()
+
+
+def compile_python(python_source: str) -> CodeType:
+    key = hashlib.sha256(python_source.encode()).hexdigest()
+    if (code_object := code_object_cache.get(key)) is None:
+        code_object = compile(python_source, f"<minithon {key[:12]}>", "exec")
+        if len(code_object_cache) >= CODE_OBJECT_CACHE_SIZE:
+            del code_object_cache[next(iter(code_object_cache))]
+        code_object_cache[key] = code_object
+    return code_object
+
+
+def compile_function(
+    code: Code, input_identifiers: Iterable[str] = ()
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    # Input values are passed on each call, only their names are baked into the function
+    namespace: dict[str, Any] = {}
+    exec(compile_python(generate_python(code, input_identifiers)), namespace)
+    return namespace[FUNCTION_NAME]
+
+
+def execute(code: Code, inputs: dict[str, Any] | None = None) -> dict[str, Any]:
+    inputs = inputs or {}
+    return compile_function(code, inputs)(inputs)
@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable
+
+from minithon.interpreter import assemble, execute
+from minithon.lexer import tokens_pattern
+from minithon.compiler import compile_source
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+EXECUTION_ERROR = -32000
+
+ANSI_ESCAPE_REGEX = re.compile(r"\033\[[0-9;]*m")
+# Requests carry whole source files so lines can be much longer than asyncio's 64 KiB default
+MAX_LINE_LENGTH = 64 * 1024 * 1024
+LATENCY_WINDOW = 10_000
+# Keeps a runaway loop from holding a worker forever, about ten seconds of execution
+MAX_STEPS = 10_000_000
+
+
+class InvalidParams(Exception):
+    pass
+
+
+class ExecutionError(Exception):
+    pass
+
+
+def init_worker() -> None:
+    # Ctrl+C is handled by the server, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Compile the token regex once per worker process instead of on its first request
+    tokens_pattern()
+
+
+def noop_job() -> None:
+    pass
+
+
+# Jobs return their errors as strings instead of raising, so nothing a request does can
+# fail to unpickle in the server and break the pool
+
+
+def compile_job(source_code: str) -> dict[str, Any]:
+    try:
+        compilation = compile_source(source_code)
+    except Exception as e:
+        return {"intermediate_code": "", "variables": {}, "errors": [repr(e)]}
+    return {
+        "intermediate_code": compilation.intermediate_code,
+        "variables": compilation.variables,
+        "errors": [ANSI_ESCAPE_REGEX.sub("", str(e)) for e in compilation.errors],
+    }
+
+
+def run_job(
+    intermediate_code: str,
+    variables: dict[str, str],
+    inputs: dict[str, Any],
+    max_steps: int,
+) -> tuple[dict[str, Any] | None, str | None]:
+    try:
+        code = assemble(intermediate_code, variables)
+        return execute(code, inputs, max_steps), None
+    except Exception as e:
+        return None, repr(e)
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, round(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class CompileServer:
+    def __init__(
+        self, workers: int | None = None, cache_size=256, max_steps=MAX_STEPS
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = self.create_pool()
+        # Compile results keyed by the SHA-256 of the source, least recently used first
+        self.cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.cache_size = cache_size
+        self.max_steps = max_steps
+        self.latencies: dict[str, deque[float]] = {}
+        self.methods: dict[
+            str, Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+        ] = {
+            "compile": self.compile,
+            "run": self.run,
+            "stats": self.stats,
+        }
+
+    def create_pool(self) -> ProcessPoolExecutor:
+        # Forked workers would inherit, and keep open, the sockets of clients connected at the time
+        return ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+
+    async def submit(self, job: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, job, *args)
+        except BrokenProcessPool:
+            # A worker died, replace the pool so the requests after this one still work.
+            # Concurrent requests on the same broken pool only replace it once.
+            if self.pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self.create_pool()
+            raise
+
+    async def compile(self, params: dict[str, Any]) -> dict[str, Any]:
+        source_code = params.get("source")
+        if not isinstance(source_code, str):
+            raise InvalidParams('"source" must be a string')
+        key = hashlib.sha256(source_code.encode()).hexdigest()
+        if (result := self.cache.get(key)) is not None:
+            self.cache.move_to_end(key)
+            return result
+        result = await self.submit(compile_job, source_code)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    async def run(self, params: dict[str, Any]) -> dict[str, Any]:
+        inputs = params.get("inputs", {})
+        if not isinstance(inputs, dict):
+            raise InvalidParams('"inputs" must be an object')
+        compilation = await self.compile(params)
+        if compilation["errors"]:
+            return {"variables": None, "errors": compilation["errors"]}
+        for identifier in inputs:
+            if identifier not in compilation["variables"]:
+                raise InvalidParams(f'Unknown input variable "{identifier}"')
+        variables, error = await self.submit(
+            run_job,
+            compilation["intermediate_code"],
+            compilation["variables"],
+            inputs,
+            self.max_steps,
+        )
+        if error is not None:
+            raise ExecutionError(error)
+        return {"variables": variables, "errors": []}
+
+    def latency_stats(self) -> dict[str, dict[str, float]]:
+        stats: dict[str, dict[str, float]] = {}
+        for method, latencies in self.latencies.items():
+            sorted_latencies = sorted(latencies)
+            stats[method] = {"count": len(sorted_latencies)}
+            for percent in (50, 90, 99):
+                latency = percentile(sorted_latencies, percent)
+                stats[method][f"p{percent}_ms"] = latency * 1000
+        return stats
+
+    async def stats(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "latencies": self.latency_stats(),
+            "cached_compilations": len(self.cache),
+        }
+
+    async def handle(self, line: str) -> dict[str, Any] | None:
+        start_time = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return error_response(None, PARSE_ERROR, "Parse error")
+        if not isinstance(request, dict) or not isinstance(
+            request.get("method"), str
+        ):
+            return error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method_name: str = request["method"]
+        method = self.methods.get(method_name)
+        if method is None:
+            return error_response(request_id, METHOD_NOT_FOUND, "Method not found")
+        params = request.get("params", {})
+        try:
+            if not isinstance(params, dict):
+                raise InvalidParams("params must be an object")
+            result = await method(params)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except InvalidParams as e:
+            response = error_response(request_id, INVALID_PARAMS, str(e))
+        except ExecutionError as e:
+            response = error_response(request_id, EXECUTION_ERROR, str(e))
+        except Exception as e:
+            response = error_response(request_id, EXECUTION_ERROR, repr(e))
+        finally:
+            self.latencies.setdefault(
+                method_name, deque(maxlen=LATENCY_WINDOW)
+            ).append(time.perf_counter() - start_time)
+        # Requests without an id are notifications and get no response
+        return response if "id" in request else None
+
+    async def serve_lines(
+        self,
+        read_line: Callable[[], Awaitable[str]],
+        write_line: Callable[[str], None],
+    ) -> None:
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def respond(line: str) -> None:
+            response = await self.handle(line)
+            if response is not None:
+                write_line(json.dumps(response))
+
+        # Each request gets its own task so slow requests don't hold up the ones behind them
+        while line := await read_line():
+            if not line.strip():
+                continue
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        async def read_line() -> str:
+            # A thread works for stdin whether it's a pipe, file or terminal
+            return await loop.run_in_executor(None, sys.stdin.readline)
+
+        def write_line(line: str) -> None:
+            sys.stdout.write(f"{line}\n")
+            sys.stdout.flush()
+
+        await self.serve_lines(read_line, write_line)
+
+    async def serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        async def read_line() -> str:
+            return (await reader.readline()).decode()
+
+        def write_line(line: str) -> None:
+            writer.write(f"{line}\n".encode())
+
+        try:
+            await self.serve_lines(read_line, write_line)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def warm_up(self) -> None:
+        # Workers are spawned on demand, so start all of them before the first request
+        await asyncio.gather(*(self.submit(noop_job) for _ in range(self.workers)))
+
+    async def serve(self, socket_path: str | None = None) -> None:
+        try:
+            await self.warm_up()
+            if socket_path is None:
+                await self.serve_stdio()
+                return
+            server = await asyncio.start_unix_server(
+                self.serve_connection, socket_path, limit=MAX_LINE_LENGTH
+            )
+            async with server:
+                await server.serve_forever()
+        finally:
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.pool.shutdown(cancel_futures=True)
+            self.print_stats()
+
+    def print_stats(self) -> None:
+        for method, stats in self.latency_stats().items():
+            print(
+                f"{method}: {stats['count']:.0f} requests, "
+                f"p50 {stats['p50_ms']:.2f}ms, "
+                f"p90 {stats['p90_ms']:.2f}ms, "
+                f"p99 {stats['p99_ms']:.2f}ms",
+                file=sys.stderr,
+            )
+
+
+def error_response(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+def serve(
+    socket_path: str | None = None,
+    workers: int | None = None,
+    max_steps: int | None = None,
+) -> None:
+    if max_steps is None:
+        max_steps = MAX_STEPS
+    try:
+        asyncio.run(CompileServer(workers, max_steps=max_steps).serve(socket_path))
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,23 @@
-from PrettyPrint.PrintLinkedList.LinkedListPrinter import Callable
+from typing import Any, Callable
+from minithon import python_backend
+from minithon.binary_ir import CodeFile, write
 from minithon.icg import ICG
+from minithon.interpreter import assemble, execute
 from minithon.lexer import Token, tokenize
+from minithon.compiler import compile_source
 from pprint import pprint
 from pathlib import Path
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
 import time
 
+from minithon.parser.export import export_dot, export_jsonl, export_sexpr
 from minithon.parser.main import Parser
-from minithon.parser.types import Program
+from minithon.parser.types import NodeWrapper, Program
 
 CURR_ROOT_DIR = Path(__file__).parent
 
@@ -45,19 +56,95 @@ def test_lexer(
     return tokens
 
 
-def test_parser(source_code: str | None = None, show_output=True) -> Program:
+def test_parser(
+    source_code: str | None = None, show_output=True, stop_on_error=False
+) -> Program:
     if source_code is None:
         source_code = get_source_code()
     tokens = test_lexer(source_code, True, True)
     parser = Parser(tokens, source_code)
     prt = print_runtime_later("Parser")
-    program = parser.parse()
+    program, exceptions = parser.parse(stop_on_error)
     if show_output:
         prt()
         program.print_parse_tree()
+        for e in exceptions:
+            print(e)
     return program
 
 
+def test_parser_errors(lines=100, show_output=True) -> None:
+    # Every other statement is broken, all of them should be reported in one pass
+    # (broken statement, line of the error relative to the statement's first line)
+    broken_statements = [("x = ", 0), ("x = 1 +", 0), ("x = (1 +\n2 +)", 1)]
+    source_code = ""
+    line_number = 1
+    expected_line_numbers: list[int] = []
+    for index in range(lines):
+        # A valid statement spanning two lines in between
+        source_code += f"y = ({index} +\n{index})\n"
+        line_number += 2
+        broken_statement, error_line = broken_statements[index % len(broken_statements)]
+        source_code += f"{broken_statement}\n"
+        expected_line_numbers.append(line_number + error_line)
+        line_number += broken_statement.count("\n") + 1
+    tokens, _ = tokenize(source_code)
+    _, exceptions = Parser(tokens, source_code).parse()
+    line_numbers = [e.line_number for e in exceptions]
+    assert line_numbers == expected_line_numbers, line_numbers
+    if show_output:
+        print(f"Parser errors: {len(exceptions)} broken statements reported")
+
+
+def test_export(depth=100_000, show_output=True) -> None:
+    source_code = "x = 1\n"
+    tokens, _ = tokenize(source_code)
+    program, _ = Parser(tokens, source_code).parse()
+    expected_outputs = {
+        export_jsonl: (
+            '{"id": 0, "parent": null, "type": "Program", "value": "PROGRAM"}\n'
+            '{"id": 1, "parent": 0, "type": "Block", "value": "BLOCK #1"}\n'
+            '{"id": 2, "parent": 1, "type": "AssignmentStatement", '
+            '"value": "ASSIGN_STMT"}\n'
+            '{"id": 3, "parent": 2, "type": "Expression", "value": "x"}\n'
+            '{"id": 4, "parent": 2, "type": "Expression", "value": "1"}\n'
+        ),
+        export_dot: (
+            "digraph ParseTree {\n"
+            '  n0 [label="PROGRAM"];\n'
+            '  n1 [label="BLOCK #1"];\n'
+            "  n0 -> n1;\n"
+            '  n2 [label="ASSIGN_STMT"];\n'
+            "  n1 -> n2;\n"
+            '  n3 [label="x"];\n'
+            "  n2 -> n3;\n"
+            '  n4 [label="1"];\n'
+            "  n2 -> n4;\n"
+            "}\n"
+        ),
+        export_sexpr: '("PROGRAM" ("BLOCK #1" ("ASSIGN_STMT" "x" "1")))\n',
+    }
+    for export, expected in expected_outputs.items():
+        file = io.StringIO()
+        export(program, file)
+        assert file.getvalue() == expected, file.getvalue()
+    # A chain far deeper than the recursion limit
+    root = NodeWrapper()
+    for _ in range(depth - 1):
+        root = NodeWrapper([root])
+    file = io.StringIO()
+    export_jsonl(root, file)
+    assert file.getvalue().count("\n") == depth
+    file = io.StringIO()
+    export_sexpr(root, file)
+    assert file.getvalue().count("(") == depth - 1
+    file = io.StringIO()
+    export_dot(root, file)
+    assert file.getvalue().count("->") == depth - 1
+    if show_output:
+        print(f"Export: expected output, {depth} deep tree exported")
+
+
 def test_icg(source_code: str | None = None, show_output=True) -> str:
     if source_code is None:
         source_code = get_source_code()
@@ -71,5 +158,233 @@ def test_icg(source_code: str | None = None, show_output=True) -> str:
     return intermediate_code
 
 
+def test_interpreter(
+    source_code: str | None = None, show_output=True
+) -> dict[str, Any]:
+    if source_code is None:
+        source_code = get_source_code()
+    program = test_parser(source_code, show_output)
+    icg = ICG()
+    intermediate_code = icg.generate(program, source_code)
+    if show_output:
+        print(intermediate_code)
+    prt = print_runtime_later("Interpreter")
+    variables = execute(assemble(intermediate_code, icg.variables))
+    if show_output:
+        prt()
+        pprint(variables)
+    return variables
+
+
+# (source code, inputs, expected variables)
+VARIABLE_CASES: list[tuple[str, dict[str, Any], dict[str, Any]]] = [
+    ("a = 1\nif a == 2:\n    b = 5\nb = 7\n", {}, {"a": 1, "b": 7}),
+    ("a = 1\nif a == 2:\n    b = 5\nb = 7\n", {"a": 2}, {"a": 2, "b": 7}),
+    ("a = 1\nif a == 2:\n    b = 5\nelse:\n    b = 6\n", {}, {"a": 1, "b": 6}),
+    (
+        "a = 1\nif a == 2:\n    b = 5\nelse:\n    b = 6\n",
+        {"a": 2},
+        {"a": 2, "b": 5},
+    ),
+    (
+        "a = 2 and 1\nb = 1.5 and a\nc = 0 or a\nd = 0\nif a and 1:\n    d = 1\n",
+        {},
+        {"a": 1, "b": 1, "c": 1, "d": 1},
+    ),
+    (
+        "a = 1\nif a == 1:\n    b = 5\nc = 10\nb = 7\n",
+        {},
+        {"a": 1, "b": 7, "c": 10},
+    ),
+]
+
+
+def test_variables(show_output=True) -> None:
+    for source_code, inputs, expected in VARIABLE_CASES:
+        compilation = compile_source(source_code)
+        code = assemble(compilation.intermediate_code, compilation.variables)
+        tokens, _ = tokenize(source_code)
+        program, _ = Parser(tokens, source_code).parse()
+        icg = ICG()
+        reused_code = assemble(icg.generate(program, source_code, True), icg.variables)
+        for backend, variables in (
+            ("Interpreter", execute(code, inputs)),
+            ("Python backend", python_backend.execute(code, inputs)),
+            ("Reused registers", execute(reused_code, inputs)),
+        ):
+            assert variables == expected, f"{backend}: {variables} != {expected}"
+    if show_output:
+        print(f"Variables: {len(VARIABLE_CASES)} cases passed")
+
+
+def test_binary_ir(
+    source_code: str | None = None, show_output=True
+) -> dict[str, Any]:
+    if source_code is None:
+        source_code = get_source_code()
+    program = test_parser(source_code, show_output)
+    icg = ICG()
+    intermediate_code = icg.generate(program, source_code)
+    code = assemble(intermediate_code, icg.variables)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "test_code.mic"
+        prt = print_runtime_later("Binary IR write")
+        write(code, path)
+        if show_output:
+            prt()
+        prt = print_runtime_later("Binary IR load and execute")
+        with CodeFile(path) as code_file:
+            variables = execute(code_file.code)
+            if show_output:
+                prt()
+                pprint(variables)
+            loaded_code = code_file.code
+            assert list(loaded_code.instructions) == code.instructions
+            assert list(loaded_code.constants) == code.constants
+            assert loaded_code.register_count == code.register_count
+            assert loaded_code.variables == code.variables
+        expected = execute(code)
+        assert variables == expected, f"{variables} != {expected}"
+    return variables
+
+
+def test_batch(batch_size=200, input_variable="number", show_output=True) -> None:
+    # Imported here so the other tests don't need NumPy
+    import numpy as np
+    from minithon.batch import execute_batch
+
+    compilation = compile_source(get_source_code())
+    code = assemble(compilation.intermediate_code, compilation.variables)
+    values = np.arange(batch_size)
+    outputs = execute_batch(code, {input_variable: values})
+    for lane, value in enumerate(values):
+        variables = execute(code, {input_variable: int(value)})
+        for identifier, expected in variables.items():
+            output = outputs[identifier]
+            actual = None if np.ma.getmaskarray(output)[lane] else output.data[lane]
+            assert actual == expected, f"{identifier} = {actual} != {expected}"
+    if show_output:
+        print(f"Batch: {batch_size} lanes match the interpreter")
+
+
+def benchmark_batch(
+    batch_sizes=(1_000, 10_000, 100_000),
+    input_variable="number",
+    max_scalar_runs=10_000,
+) -> None:
+    # Imported here so the other tests don't need NumPy
+    import numpy as np
+    from minithon.batch import execute_batch
+
+    compilation = compile_source(get_source_code())
+    code = assemble(compilation.intermediate_code, compilation.variables)
+    for batch_size in batch_sizes:
+        values = np.random.randint(0, 1_000_000, batch_size)
+        start_time = time.perf_counter()
+        execute_batch(code, {input_variable: values})
+        batch_runtime = time.perf_counter() - start_time
+        # Scalar runs are extrapolated past max_scalar_runs since they're so slow
+        scalar_runs = min(batch_size, max_scalar_runs)
+        start_time = time.perf_counter()
+        for value in values[:scalar_runs]:
+            execute(code, {input_variable: int(value)})
+        scalar_runtime = (time.perf_counter() - start_time) * batch_size / scalar_runs
+        print(
+            f"Batch size {batch_size}: batch {batch_runtime:.4f} seconds, "
+            f"scalar {scalar_runtime:.4f} seconds, "
+            f"speedup {scalar_runtime / batch_runtime:.1f}x"
+        )
+
+
+def benchmark_backends(runs=5) -> None:
+    with open(CURR_ROOT_DIR / "benchmark_code.mipy") as f:
+        source_code = f.read()
+    compilation = compile_source(source_code)
+    code = assemble(compilation.intermediate_code, compilation.variables)
+    function = python_backend.compile_function(code)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "benchmark_code.mic"
+        write(code, path)
+        with CodeFile(path) as code_file:
+            strategies: dict[str, Callable[[], Any]] = {
+                "Interpreter": lambda: execute(code),
+                "Memory-mapped binary IR": lambda: execute(code_file.code),
+                "Python backend": lambda: function({}),
+            }
+            try:
+                from minithon.batch import execute_batch
+
+                strategies["Batch of one"] = lambda: execute_batch(code, {})
+            except ImportError:
+                pass
+            for strategy, callback in strategies.items():
+                runtimes: list[float] = []
+                for _ in range(runs):
+                    start_time = time.perf_counter()
+                    callback()
+                    runtimes.append(time.perf_counter() - start_time)
+                runtime = statistics.median(runtimes)
+                print(f"{strategy} runtime: {runtime:.4f} seconds")
+
+
+def test_import_time(
+    module="minithon.icg", runs=10, show_output=True
+) -> float:
+    # Each run is a fresh interpreter so that the module cache is cold
+    cumulative_times: list[int] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=CURR_ROOT_DIR.parent,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            # Nested imports are indented, only the top-level import's line has one space
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2] == f" {module}":
+                cumulative_times.append(int(fields[1]))
+    if not cumulative_times:
+        raise RuntimeError(f"No import time was reported for {module}")
+    median_runtime = statistics.median(cumulative_times) / 1_000_000
+    if show_output:
+        print(f"{module} import runtime: {median_runtime:.4f} seconds")
+    return median_runtime
+
+
+def test_server(show_output=True) -> None:
+    # A request that fails inside a worker must not break the requests after it
+    sources = ["x = 1 not 2\n", "x = 1 / 0\n", "x = 1\n"]
+    requests = [
+        {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "run",
+            "params": {"source": source},
+        }
+        for request_id, source in enumerate(sources)
+    ]
+    result = subprocess.run(
+        [sys.executable, "-m", "minithon", "--serve", "--workers", "1"],
+        input="".join(f"{json.dumps(request)}\n" for request in requests),
+        capture_output=True,
+        text=True,
+        cwd=CURR_ROOT_DIR.parent,
+        timeout=60,
+    )
+    responses = {
+        response["id"]: response
+        for response in map(json.loads, result.stdout.splitlines())
+    }
+    assert responses[0]["error"]["code"] == -32000, responses[0]
+    assert responses[1]["error"]["code"] == -32000, responses[1]
+    assert responses[2]["result"]["variables"] == {"x": 1}, responses[2]
+    if show_output:
+        print("Server: failed requests don't break later ones")
+
+
 if __name__ == "__main__":
     test_icg()